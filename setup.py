@@ -6,10 +6,10 @@ setup(
     packages=find_packages(where="src"),
     package_dir={"": "src"},
     install_requires=[
-        "python-dotenv>=1.0.0",
         "requests>=2.28.0",
         "dynaconf>=3.2.10",
-        "toml>=0.10.2",
+        "tomli>=2.0.1; python_version<'3.11'",
+        "tomli-w>=1.0.0",
         "PyYAML>=6.0.2",
         "langgraph>=0.0.10",
         "openai>=1.3.0",
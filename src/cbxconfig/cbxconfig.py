@@ -6,17 +6,130 @@ It allows loading configuration from various sources with priority order.
 """
 
 import os
+import sys
+import copy
 import json
-import yaml
-import toml
 import logging
+from functools import lru_cache
 from typing import Dict, Any
-from dynaconf import Dynaconf
+
+# NOTE: yaml, toml and dynaconf are imported lazily inside the
+# functions that need them; they dominate CLI startup time otherwise
+
+# orjson is an optional C-accelerated replacement for the stdlib json
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 
 # Set up logging
 logger = logging.getLogger(__name__)
 
+# Parsed config file cache keyed by (path, mtime_ns, size) so repeated
+# loads of an unchanged file skip the parse entirely
+_FILE_CACHE: Dict[tuple, Any] = {}
+
+# Pristine Dynaconf as_dict() results keyed by (app_name, settings file
+# mtimes) so repeated constructions skip re-reading unchanged settings
+# files. Only the parsed dict is cached — never the live Dynaconf
+# instance — so per-construction overrides cannot leak between instances.
+_DYNACONF_CACHE: Dict[tuple, Any] = {}
+
+# Directories save_to_file has already created; skips repeat syscalls
+_ENSURED_DIRS = set()
+
+
+# Sentinel for "key not present" lookups
+_MISSING = object()
+
+
+@lru_cache(maxsize=1024)
+def _split_path(key: str) -> tuple:
+    """Split a dot-notation key path once and cache the result."""
+    return tuple(key.split('.'))
+
+
+def _load_json(data):
+    if orjson:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _load_yaml(data):
+    import yaml
+    # Use the libyaml C bindings when PyYAML was built with them
+    try:
+        from yaml import CSafeLoader as SafeLoader
+    except ImportError:
+        from yaml import SafeLoader
+    return yaml.load(data, Loader=SafeLoader)
+
+
+def _load_toml(data):
+    # stdlib tomllib (3.11+) / tomli are C-accelerated; the pure-Python
+    # toml package stays as a last-resort fallback
+    try:
+        import tomllib
+    except ImportError:
+        try:
+            import tomli as tomllib
+        except ImportError:
+            tomllib = None
+    if tomllib:
+        return tomllib.loads(data.decode())
+    import toml
+    return toml.loads(data.decode())
+
+
+def _dump_json(config, f):
+    if orjson:
+        f.write(orjson.dumps(config, option=orjson.OPT_INDENT_2).decode())
+    else:
+        # serialize in one go; json.dump writes many small chunks
+        f.write(json.dumps(config, indent=2))
+
+
+def _dump_yaml(config, f):
+    import yaml
+    try:
+        from yaml import CSafeDumper as SafeDumper
+    except ImportError:
+        from yaml import SafeDumper
+    yaml.dump(config, f, Dumper=SafeDumper, default_flow_style=False)
+
+
+def _dump_toml(config, f):
+    try:
+        import tomli_w
+    except ImportError:
+        import toml
+        toml.dump(config, f)
+        return
+    f.write(tomli_w.dumps(config))
+
+
+def _load_env_file(path):
+    """Populate os.environ from a KEY=VAL file (a minimal .env reader)."""
+    try:
+        with open(path, 'rb') as f:
+            lines = f.read().splitlines()
+    except OSError:
+        return
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith(b'#') or b'=' not in line:
+            continue
+        k, v = line.split(b'=', 1)
+        v = v.strip().strip(b'"').strip(b"'")
+        os.environ.setdefault(k.strip().decode(), v.decode())
+
+
+# File-format dispatch by extension (avoids chained endswith checks
+# and gives a single place to register new formats)
+_LOADERS = {'.json': _load_json, '.yaml': _load_yaml, '.yml': _load_yaml, '.toml': _load_toml}
+_DUMPERS = {'.json': _dump_json, '.yaml': _dump_yaml, '.yml': _dump_yaml, '.toml': _dump_toml}
+
 
 
 
@@ -36,9 +149,10 @@ class CbxConfig:
             args: command line arguments
             default_config: Optional dictionary with default configuration values.
         """
-
         self.app_name = app_name.upper()
         self._config = {}
+        # memoized get() results; invalidated on any write
+        self._get_cache = {}
 
 
         self.set('_current_dir', os.getcwd())
@@ -53,67 +167,90 @@ class CbxConfig:
 
         settings_files = []
         config_dir = self.get('_config_dir')
-        config_path = os.path.join(config_dir,"config.toml")
-        secrets_path = os.path.join(config_dir,"secrets.toml")
 
-        if os.path.isfile(config_path):
-            settings_files.append(config_path)
-        if os.path.isfile(secrets_path):
-            settings_files.append(secrets_path)
+        # one scandir instead of a stat per candidate file
+        try:
+            entries = {e.name for e in os.scandir(config_dir) if e.is_file()}
+        except (FileNotFoundError, NotADirectoryError):
+            entries = set()
+
+        if "config.toml" in entries:
+            settings_files.append(os.path.join(config_dir, "config.toml"))
+        if "secrets.toml" in entries:
+            settings_files.append(os.path.join(config_dir, "secrets.toml"))
 
         if len(settings_files) == 0:
             settings_files = None
 
-        settings = Dynaconf(
-            envvar_prefix=self.app_name,  # Prefix for environment variables
-            settings_files=settings_files,
-            default_settings=self._defaults,  # Apply default values
-            lowercase_read=True
-        )
-
-        # Update settings from Args
-        for key, value in vars(args).items():
-            if value is not None:
-                settings_key = key.replace('-', '_').lower()  # Convert to lowercase here
-                settings.set(settings_key, value)
-
-        # Get full settings dictionary and normalize everything to lowercase
-        settings_dict = settings.as_dict()
-        final_config = {}
-
-        # First, initialize with defaults (all lowercase)
-        for key, value in self._defaults.items():
-            final_config[key.lower()] = value
-
-        # Then extract from DEFAULT_SETTINGS if present
-        if 'DEFAULT_SETTINGS' in settings_dict:
-            for key, value in settings_dict['DEFAULT_SETTINGS'].items():
-                if value:  # Only update if the value is not empty or None
-                    final_config[key.lower()] = value
-
-        # Then add top-level settings (like environment variables)
-        for key, value in settings_dict.items():
-            if key != 'DEFAULT_SETTINGS' and not key.startswith('_'):
-                # Only override if value is not empty
-                if value:
-                    final_config[key.lower()] = value
+        # Fast path: with no settings files and no prefixed env vars
+        # there is nothing for Dynaconf to merge, so skip constructing
+        # it entirely (it alone can dominate CLI startup)
+        prefix = self.app_name + '_'
+        if settings_files is None and not any(k.startswith(prefix) for k in os.environ):
+            defaults_l = {k.lower(): v for k, v in self._defaults.items()}
+            overrides = {key.replace('-', '_').lower(): value
+                         for key, value in vars(args).items() if value}
+            self._config = {**defaults_l, **overrides}
+            self._get_cache.clear()
+            return
+
+        from dynaconf import Dynaconf
+
+        # Prefixed env vars are part of what Dynaconf folds into
+        # as_dict(), so they must be part of the key or a change between
+        # constructions would be served from the stale parse
+        env_snapshot = tuple(sorted(
+            (k, v) for k, v in os.environ.items() if k.startswith(prefix)))
+        cache_key = (self.app_name, config_dir,
+                     tuple((p, os.stat(p).st_mtime_ns) for p in settings_files or ()),
+                     env_snapshot)
+        settings_dict = _DYNACONF_CACHE.get(cache_key)
+        if settings_dict is None:
+            settings = Dynaconf(
+                envvar_prefix=self.app_name,  # Prefix for environment variables
+                settings_files=settings_files,
+                default_settings=self._defaults,  # Apply default values
+                lowercase_read=True
+            )
+            # Cache the pristine parse only; the instance itself must not
+            # be shared or overrides would bleed between constructions
+            _DYNACONF_CACHE[cache_key] = settings.as_dict()
+            settings_dict = _DYNACONF_CACHE[cache_key]
+
+        # Work on a private copy so the merged tree (and later set()
+        # calls on it) never touches the cached dict
+        settings_dict = copy.deepcopy(settings_dict)
+
+        # Command line overrides from Args, applied per instance on top
+        # of the parsed settings. Empty values never override (matching
+        # the fast path): argparse emits False for every unset store_true
+        # flag, and that must not clobber truthy settings.
+        overrides = {key.replace('-', '_').lower(): value  # Convert to lowercase here
+                     for key, value in vars(args).items() if value}
+
+        # Lowercase each source once, then merge in priority order
+        # (defaults, then DEFAULT_SETTINGS, then top-level settings such
+        # as environment variables, then CLI overrides) in a single
+        # C-level dict merge. Empty values never override.
+        defaults_l = {k.lower(): v for k, v in self._defaults.items()}
+        ds_l = {k.lower(): v for k, v in settings_dict.get('DEFAULT_SETTINGS', {}).items() if v}
+        top_l = {k.lower(): v for k, v in settings_dict.items()
+                 if v and k != 'DEFAULT_SETTINGS' and not k.startswith('_')}
 
         # Apply the final normalized configuration
-        self._config = final_config
+        self._config = {**defaults_l, **ds_l, **top_l, **overrides}
+        self._get_cache.clear()
+
 
+    @classmethod
+    def clear_file_cache(cls) -> None:
+        """Drop all cached parsed config files."""
+        _FILE_CACHE.clear()
 
     def reset_to_defaults(self) -> None:
         """Reset configuration to default values."""
-        self._config = self._deep_copy(self._defaults)
-
-    def _deep_copy(self, obj: Any) -> Any:
-        """Create a deep copy of a configuration object."""
-        if isinstance(obj, dict):
-            return {k: self._deep_copy(v) for k, v in obj.items()}
-        elif isinstance(obj, list):
-            return [self._deep_copy(item) for item in obj]
-        else:
-            return obj
+        self._config = copy.deepcopy(self._defaults)
+        self._get_cache.clear()
 
     def get(self, key: str, default: Any = None) -> Any:
         """
@@ -126,15 +263,29 @@ class CbxConfig:
         Returns:
             The configuration value or default if not found
         """
-        keys = key.split('.')
+        if key in self._get_cache:
+            return self._get_cache[key]
+
+        # fast path: top-level keys need no traversal
+        if '.' not in key:
+            value = self._config.get(key, _MISSING)
+            if value is _MISSING:
+                return default
+            self._get_cache[key] = value
+            return value
+
+        keys = _split_path(key)
         value = self._config
 
-        for k in keys:
-            if isinstance(value, dict) and k in value:
+        # _config is always dict-of-dicts; an exception on the miss path
+        # is cheaper than an isinstance check per level on the hit path
+        try:
+            for k in keys:
                 value = value[k]
-            else:
-                return default
+        except (KeyError, TypeError):
+            return default
 
+        self._get_cache[key] = value
         return value
 
     def set(self, key: str, value: Any) -> None:
@@ -145,17 +296,26 @@ class CbxConfig:
             key: Dot-notation key path (e.g., 'database.host')
             value: Value to set
         """
-        keys = key.split('.')
+        # fast path: top-level keys need no traversal
+        if '.' not in key:
+            self._config[key] = value
+            self._get_cache.clear()
+            return
+
+        keys = _split_path(key)
         config = self._config
 
         # Navigate to the nested dictionary, creating dictionaries as needed
         for k in keys[:-1]:
-            if k not in config or not isinstance(config[k], dict):
-                config[k] = {}
-            config = config[k]
+            nxt = config.get(k)
+            if not isinstance(nxt, dict):
+                nxt = {}
+                config[k] = nxt
+            config = nxt
 
         # Set the value at the final key
         config[keys[-1]] = value
+        self._get_cache.clear()
 
 
     def as_dict(self) -> Dict[str, Any]:
@@ -165,7 +325,101 @@ class CbxConfig:
         Returns:
             A deep copy of the current configuration dictionary
         """
-        return self._deep_copy(self._config)
+        return copy.deepcopy(self._config)
+
+    def load_env(self, env_file=None) -> None:
+        """
+        Load configuration values from environment variables.
+
+        Variables named <APP_NAME>_SOME_KEY override the config key
+        'some_key'. Values that parse as JSON are stored typed,
+        everything else is kept as a string.
+
+        Args:
+            env_file: Optional .env file to read into os.environ first.
+                      Defaults to <config_dir>/.env when present.
+        """
+        if env_file is None:
+            config_dir = self.get('_config_dir')
+            if config_dir:
+                env_file = os.path.join(config_dir, '.env')
+        if env_file and os.path.isfile(env_file):
+            _load_env_file(env_file)
+
+        prefix = self.app_name + '_'
+        plen = len(prefix)
+
+        # hoist hot lookups out of the loop
+        loads = orjson.loads if orjson else json.loads
+        decode_error = orjson.JSONDecodeError if orjson else json.JSONDecodeError
+
+        batch = {}
+        for env_key, env_value in [(k, v) for k, v in os.environ.items() if k.startswith(prefix)]:
+            key = env_key[plen:].lower()
+            try:
+                batch[key] = loads(env_value)
+            except decode_error:
+                batch[key] = env_value
+
+        if batch:
+            self._config.update(batch)
+            self._get_cache.clear()
+
+    def load_args(self, args) -> None:
+        """
+        Apply parsed command line arguments on top of the current config.
+
+        Args:
+            args: argparse.Namespace from an already-compiled parser
+        """
+        batch = {}
+        for key, value in vars(args).items():
+            if value is not None:
+                batch[key.replace('-', '_').lower()] = value
+        if batch:
+            self._config.update(batch)
+            self._get_cache.clear()
+
+    def load_file(self, file_path: str) -> bool:
+        """
+        Load configuration values from a file (JSON or YAML or TOML).
+
+        Args:
+            file_path: Path to the input file
+
+        Returns:
+            True if the file was loaded successfully, False otherwise
+        """
+        try:
+            st = os.stat(file_path)
+            cache_key = (os.path.abspath(file_path), st.st_mtime_ns, st.st_size)
+
+            if cache_key in _FILE_CACHE:
+                # unchanged file: reuse the parsed result
+                config_data = copy.deepcopy(_FILE_CACHE[cache_key])
+            else:
+                loader = _LOADERS.get(os.path.splitext(file_path)[1].lower())
+                if loader is None:
+                    logger.error("Unsupported file format: %s", file_path)
+                    return False
+
+                # read bytes and let the parser handle UTF-8 in C
+                with open(file_path, 'rb') as f:
+                    config_data = loader(f.read())
+
+                # cache a private copy: the parsed tree is merged into
+                # self._config by reference, so later set() calls would
+                # otherwise mutate the cached entry
+                _FILE_CACHE[cache_key] = copy.deepcopy(config_data)
+
+            _update_config(self._config, config_data)
+            self._get_cache.clear()
+            logger.info("Loaded configuration from %s", file_path)
+            return True
+
+        except Exception as e:
+            logger.error("Error loading configuration from %s: %s", file_path, e)
+            return False
 
     def save_to_file(self, file_path: str) -> bool:
         """
@@ -178,25 +432,25 @@ class CbxConfig:
             True if the file was saved successfully, False otherwise
         """
         try:
-            # Create directory if it doesn't exist
-            os.makedirs(os.path.dirname(os.path.abspath(file_path)), exist_ok=True)
-
-            with open(file_path, 'w') as f:
-                if file_path.endswith('.json'):
-                    json.dump(self._config, f, indent=2)
-                elif file_path.endswith(('.yaml', '.yml')):
-                    yaml.dump(self._config, f, default_flow_style=False)
-                elif file_path.endswith('.toml'):
-                    toml.dump(self._config, f)
-                else:
-                    logger.error(f"Unsupported file format: {file_path}")
-                    return False
+            # Create directory if it doesn't exist (at most once per process)
+            out_dir = os.path.dirname(os.path.abspath(file_path))
+            if out_dir not in _ENSURED_DIRS:
+                os.makedirs(out_dir, exist_ok=True)
+                _ENSURED_DIRS.add(out_dir)
+
+            dumper = _DUMPERS.get(os.path.splitext(file_path)[1].lower())
+            if dumper is None:
+                logger.error("Unsupported file format: %s", file_path)
+                return False
+
+            with open(file_path, 'w', buffering=1 << 16) as f:
+                dumper(self._config, f)
 
-            logger.info(f"Saved configuration to {file_path}")
+            logger.info("Saved configuration to %s", file_path)
             return True
 
         except Exception as e:
-            logger.error(f"Error saving configuration to {file_path}: {str(e)}")
+            logger.error("Error saving configuration to %s: %s", file_path, e)
             return False
 
 
@@ -205,14 +459,18 @@ class CbxConfig:
 
 def _flatten_dict(d, parent_key='', sep='.'):
     """Convert nested dict to flat dict with dot-notation keys."""
-    items = []
-    for k, v in d.items():
-        new_key = f"{parent_key}{sep}{k}" if parent_key else k
-        if isinstance(v, dict):
-            items.extend(_flatten_dict(v, new_key, sep=sep).items())
-        else:
-            items.append((new_key, v))
-    return dict(items)
+    # explicit stack instead of recursion: no frame per nesting level
+    out = {}
+    stack = [(parent_key, d)]
+    while stack:
+        prefix, current = stack.pop()
+        for k, v in current.items():
+            new_key = prefix + sep + k if prefix else k
+            if isinstance(v, dict):
+                stack.append((new_key, v))
+            else:
+                out[sys.intern(new_key)] = v
+    return out
 
 def _unflatten_dict(d, sep='.'):
     """Convert flat dict with dot-notation keys to nested dict."""
@@ -229,17 +487,37 @@ def _unflatten_dict(d, sep='.'):
 
 def _update_config(target, source):
     """Update target dict with values from source dict, maintaining structure."""
-    for key, value in source.items():
-        if isinstance(value, dict) and key in target and isinstance(target[key], dict):
-            # If both are dicts, update recursively
-            _update_config(target[key], value)
-        else:
+    # explicit stack instead of recursion: no frame per nesting level
+    stack = [(source, target)]
+    while stack:
+        src, tgt = stack.pop()
+        for key, value in src.items():
+            if isinstance(value, dict):
+                existing = tgt.get(key)
+                if isinstance(existing, dict):
+                    # both are dicts, merge deeper
+                    stack.append((value, existing))
+                    continue
             # Otherwise, update the value
-            target[key] = value
+            tgt[key] = value
+
 
 
 
 
+# Log-level names resolved with one dict lookup instead of getattr
+# plus exception handling on every configure_logging call
+_LEVEL_MAP = {
+    'CRITICAL': logging.CRITICAL,
+    'FATAL': logging.CRITICAL,
+    'ERROR': logging.ERROR,
+    'WARNING': logging.WARNING,
+    'WARN': logging.WARNING,
+    'INFO': logging.INFO,
+    'DEBUG': logging.DEBUG,
+    'NOTSET': logging.NOTSET,
+}
+
 
 def configure_logging(log_file=None, quiet_flag=False, log_level="INFO"):
     """
@@ -265,9 +543,8 @@ def configure_logging(log_file=None, quiet_flag=False, log_level="INFO"):
     if log_level is None:
         numeric_level = logging.INFO
     elif isinstance(log_level, str):
-        try:
-            numeric_level = getattr(logging, log_level.upper())
-        except (AttributeError, TypeError):
+        numeric_level = _LEVEL_MAP.get(log_level.upper())
+        if numeric_level is None:
             numeric_level = logging.INFO
             print(f"Invalid log level: {log_level}, defaulting to INFO")
     else:
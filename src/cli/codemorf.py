@@ -5,19 +5,9 @@ import json
 import os
 import logging
 import sys
-
-# TODO: cleanup import for development
-try:
-    # import when package is installed
-    from core.workflow import create_refactoring_workflow, WorkflowState
-    from core.llm import get_llm_client
-    from cbxconfig import configure_logging
-    from cbxconfig import CbxConfig
-except ImportError:
-    print("Failed to import Submodules in file: {}".format(__file__))
-    print('For local development use "pip install -e ." in repo root')
-    sys.exit(1)
-
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
 
 APP_NAME = "codemorf"
 # Default configuration values
@@ -55,13 +45,15 @@ DEFAULT_CONFIG = {
 }
 
 
-def process_all_args(app_name, default_config):
+@lru_cache(maxsize=None)
+def _build_parser(app_name):
+    """Build the argument parser once per process; DEFAULT_CONFIG is static."""
 
     required_keys = ['input_code_file', 'rules_file', 'testcases_file']
 
     parser = argparse.ArgumentParser(description=f"{app_name} configuration")
 
-    for key, value in default_config.items():
+    for key, value in DEFAULT_CONFIG.items():
         # Note: key names don't have hyphens
         arg_name = key.replace('_', '-')
 
@@ -88,14 +80,42 @@ def process_all_args(app_name, default_config):
                 help=f"Override config value for:  {key}"
             )
 
-    args = parser.parse_args()
+    return parser
+
+
+def process_all_args(app_name, default_config):
+    args = _build_parser(app_name).parse_args()
     return args
 
 
 
+@dataclass(frozen=True)
+class ResolvedPaths:
+    """File paths derived from config once so downstream code never re-queries it."""
+    input_src: str
+    rules: str
+    testcases: str
+    output: str
+    test_results: str
+
+
 def main():
     args = process_all_args(APP_NAME, DEFAULT_CONFIG)
 
+    # Deferred until after argparse so `codemorf --help` never pays for
+    # the workflow/LLM dependency tree
+    # TODO: cleanup import for development
+    try:
+        # import when package is installed
+        from core.workflow import create_refactoring_workflow
+        from core.llm import get_llm_client
+        from cbxconfig import configure_logging
+        from cbxconfig import CbxConfig
+    except ImportError:
+        print("Failed to import Submodules in file: {}".format(__file__))
+        print('For local development use "pip install -e ." in repo root')
+        sys.exit(1)
+
     configure_logging(args.log_file, args.quiet, args.log_level)
     logger = logging.getLogger(__name__)
     logger.info(f"Starting {APP_NAME}")
@@ -109,22 +129,24 @@ def main():
     #     appcfg.load(args)
 
 
-    input_scr_file = os.path.join(appcfg.get('input_dir'), appcfg.get('input_code_file'))
-    rules_file = os.path.join(appcfg.get('input_dir'), appcfg.get('rules_file'))
-    testcases_file = os.path.join(appcfg.get('input_dir'), appcfg.get('testcases_file'))
+    input_dir = appcfg.get('input_dir')
+    output_dir = appcfg.get('output_dir')
     output_filename = "{}_{}".format(appcfg.get('output_code_prefix'), appcfg.get('input_code_file'))
-    output_file_full_name= os.path.join(appcfg.get('output_dir'), output_filename)
-    test_results_file_path = os.path.join(appcfg.get('output_dir'), 'final-test-results.txt')
 
-    # Read input files
-    with open(input_scr_file, "r") as f:
-        code = f.read()
+    paths = ResolvedPaths(
+        input_src=os.path.join(input_dir, appcfg.get('input_code_file')),
+        rules=os.path.join(input_dir, appcfg.get('rules_file')),
+        testcases=os.path.join(input_dir, appcfg.get('testcases_file')),
+        output=os.path.join(output_dir, output_filename),
+        test_results=os.path.join(output_dir, 'final-test-results.txt'),
+    )
 
-    with open(rules_file, "r") as f:
-        rules = f.read()
+    # Read input files in one os.read each (size known via fstat)
+    code = Path(paths.input_src).read_text(encoding='utf-8')
+    rules = Path(paths.rules).read_text(encoding='utf-8')
+    tests = Path(paths.testcases).read_text(encoding='utf-8')
 
-    with open(testcases_file, "r") as f:
-        tests = f.read()
+    save_workflow_stages = appcfg.get('save_workflow_stages')
 
     # Create LLM client
     llm = get_llm_client(appcfg)
@@ -140,9 +162,9 @@ def main():
         "iteration": 0,  # Add iteration counter
         "max_retries": appcfg.get('max_retries'),  # Add max retries setting
         "code_language": appcfg.get('code_language'),  # Add code language setting
-        "save_workflow_stages": appcfg.get('save_workflow_stages'),  # Add save_test_commands setting
+        "save_workflow_stages": save_workflow_stages,  # Add save_test_commands setting
         "work_dir": appcfg.get('work_dir'),
-        "output_file": output_file_full_name,  # Add output_file path
+        "output_file": paths.output,  # Add output_file path
         "logger": logger  # Add logger to inputs
     }
 
@@ -153,15 +175,16 @@ def main():
     logger.debug(result)
 
 
-    # Save outputs
-    with open(output_file_full_name, "w") as f:
-        f.write(result['refactored_code'])
+    # Save outputs; the original code is the output when the workflow
+    # short-circuited before refactoring
+    with open(paths.output, "w") as f:
+        f.write(result.get('refactored_code') or result['original_code'])
 
-    if appcfg.get('save_workflow_stages'):
-        with open(test_results_file_path, "w") as f:
+    if save_workflow_stages:
+        with open(paths.test_results, "w") as f:
             json.dump(result["test_results"].get("test_results"), f, indent=2)
 
-    logger.info(f"Refactoring complete. Output saved to {output_file_full_name}")
+    logger.info(f"Refactoring complete. Output saved to {paths.output}")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
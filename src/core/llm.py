@@ -1,20 +1,48 @@
 # core/llm.py - LLM client for interacting with LLM providers
 
+import asyncio
 import os
 import json
+import time
+import hashlib
+import sqlite3
+import threading
 import logging
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
 from enum import Enum
-from typing import Optional, Dict, Any
+from typing import List, Optional, Dict, Any
 
 import requests
-import ollama
-import openai
-import anthropic
+
+try:
+    import orjson
+except ImportError:  # optional speedup; stdlib json is the fallback
+    orjson = None
+
+# NOTE: the ollama/openai/anthropic SDKs are imported lazily inside the
+# provider that needs them; each pulls a heavy dependency tree and only
+# one provider is ever active per run
 
 # Get Ollama API mode from environment
 OLLAMA_API_ENABLED = os.getenv("OLLAMA_API_ENABLED", "true").lower() == "true"
 
+
+def _open_prompt_cache():
+    """Open the on-disk prompt cache; disabled unless CODEMORF_CACHE_DIR is set."""
+    cache_dir = os.getenv("CODEMORF_CACHE_DIR")
+    if not cache_dir:
+        return None
+    os.makedirs(cache_dir, exist_ok=True)
+    # agenerate runs generate on worker threads, so the connection must
+    # be shareable; LLMClient serializes access with a lock
+    conn = sqlite3.connect(os.path.join(cache_dir, "llm_cache.db"), check_same_thread=False)
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS prompt_cache ("
+        "prompt_hash TEXT PRIMARY KEY, response_text TEXT, created_at REAL)"
+    )
+    return conn
+
 class LLMProvider(Enum):
     OLLAMA = "ollama"
     OPENAI = "openai"
@@ -34,18 +62,51 @@ class BaseLLMProvider(ABC):
         """Generate text using the LLM provider."""
         pass
 
+    def generate_batch(self, prompts: List[str], system_prompts: Optional[List[Optional[str]]] = None) -> List[str]:
+        """Generate responses for independent prompts concurrently.
+
+        The providers' HTTP clients release the GIL during network I/O,
+        so a thread per prompt overlaps the round-trips.
+        """
+        if not prompts:
+            return []
+        if system_prompts is None:
+            system_prompts = [None] * len(prompts)
+        elif len(system_prompts) != len(prompts):
+            raise ValueError(
+                f"system_prompts length ({len(system_prompts)}) must match prompts ({len(prompts)})")
+        if len(prompts) == 1:
+            return [self.generate(prompts[0], system_prompts[0])]
+        with ThreadPoolExecutor(max_workers=len(prompts)) as executor:
+            futures = [executor.submit(self.generate, p, s)
+                       for p, s in zip(prompts, system_prompts)]
+            return [f.result() for f in futures]
+
+    def close(self):
+        """Release any resources held by the provider."""
+        pass
+
 class OllamaProvider(BaseLLMProvider):
     def __init__(self, model_name: str, host: str, logger: logging.Logger):
         super().__init__(logger)
         self.model_name = model_name
         self.host = host if host.startswith(("http://", "https://")) else f"http://{host}"
+
+        # Persistent session with keep-alive: avoids a fresh TCP handshake
+        # on every call in the refactor loop
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=10, max_retries=0)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers.update({"Connection": "keep-alive", "Accept-Encoding": "gzip, deflate"})
+
         self.logger.debug(f"Ollama API mode: {'Direct API' if OLLAMA_API_ENABLED else 'Package'}")
         
     def test_connection(self) -> bool:
         try:
             if OLLAMA_API_ENABLED:
                 # Use direct API call
-                response = requests.get(f"{self.host}/api/tags")
+                response = self.session.get(f"{self.host}/api/tags")
                 if response.status_code == 200:
                     available_models = [model["name"] for model in response.json().get("models", [])]
                     self.logger.debug(f"Available Ollama models: {', '.join(available_models) if available_models else 'None'}")
@@ -55,6 +116,7 @@ class OllamaProvider(BaseLLMProvider):
                 return False
             else:
                 # Use ollama package
+                import ollama
                 models = ollama.list()
                 available_models = [model["name"] for model in models]
                 self.logger.debug(f"Available Ollama models: {', '.join(available_models) if available_models else 'None'}")
@@ -68,29 +130,47 @@ class OllamaProvider(BaseLLMProvider):
     def generate(self, prompt: str, system_prompt: Optional[str] = None) -> str:
         try:
             if OLLAMA_API_ENABLED:
-                # Use direct API call
+                # Use direct API call, streaming the response: the 90s
+                # timeout then only bounds the gap between chunks instead
+                # of the whole generation
                 payload = {
                     "model": self.model_name,
                     "prompt": prompt,
-                    "stream": False,
+                    "stream": True,
                     "options": {"temperature": 0.7}
                 }
                 if system_prompt:
                     payload["system"] = system_prompt
 
-                response = requests.post(
+                # Pre-encode the body so requests does not re-serialize it
+                loads = orjson.loads if orjson else json.loads
+                body = orjson.dumps(payload) if orjson else json.dumps(payload).encode()
+
+                response = self.session.post(
                     f"{self.host}/api/generate",
-                    json=payload,
+                    data=body,
+                    headers={"Content-Type": "application/json"},
+                    stream=True,
                     timeout=90
                 )
 
                 if response.status_code == 200:
-                    return response.json().get("response", "")
+                    parts = []
+                    with response:
+                        for line in response.iter_lines():
+                            if not line:
+                                continue
+                            chunk = loads(line)
+                            parts.append(chunk.get("response", ""))
+                            if chunk.get("done"):
+                                break
+                    return "".join(parts)
                 error_msg = f"API request failed with status {response.status_code}"
                 self.logger.error(error_msg)
                 return f"Error: {error_msg}"
             else:
                 # Use ollama package
+                import ollama
                 options = {
                     "temperature": 0.7
                 }
@@ -108,19 +188,29 @@ class OllamaProvider(BaseLLMProvider):
             self.logger.error(f"Error generating response: {error_msg}")
             return f"Error: {error_msg}"
 
+    def close(self):
+        """Release pooled connections."""
+        self.session.close()
+
 class OpenAIProvider(BaseLLMProvider):
     def __init__(self, model_name: str, api_key, logger: logging.Logger = None):
         super().__init__(logger)
+        import openai
+        import httpx
         self.model_name = model_name
         self.api_key = api_key
 
-        openai.api_key = self.api_key
+        # One client (and one TLS session) for the provider's lifetime
+        self.client = openai.OpenAI(
+            api_key=self.api_key,
+            http_client=httpx.Client(limits=httpx.Limits(max_keepalive_connections=10)),
+        )
         self.logger.debug("Initialized OpenAI client")
 
     def test_connection(self) -> bool:
         try:
             # List models to test connection
-            models = openai.models.list()
+            models = self.client.models.list()
             available_models = [model.id for model in models.data]
             self.logger.debug(f"Available OpenAI models: {', '.join(available_models)}")
             if self.model_name not in available_models:
@@ -137,11 +227,11 @@ class OpenAIProvider(BaseLLMProvider):
                 messages.append({"role": "system", "content": system_prompt})
             messages.append({"role": "user", "content": prompt})
             
-            self.logger.debug(f"Generating response with provider openai")
-            self.logger.debug(f"Prompt length: {len(prompt)} characters")
-            self.logger.debug(f"First 100 chars of prompt: {prompt[:100]}...")
+            self.logger.debug("Generating response with provider openai")
+            self.logger.debug("Prompt length: %d characters", len(prompt))
+            self.logger.debug("First 100 chars of prompt: %.100s...", prompt)
             
-            response = openai.chat.completions.create(
+            response = self.client.chat.completions.create(
                 model=self.model_name,
                 messages=messages,
                 temperature=0.7
@@ -157,11 +247,16 @@ class OpenAIProvider(BaseLLMProvider):
 class AnthropicProvider(BaseLLMProvider):
     def __init__(self, model_name: str, api_key: Optional[str] = None, logger: logging.Logger = None):
         super().__init__(logger)
+        import anthropic
+        import httpx
         self.model_name = model_name
         self.api_key = api_key or os.getenv("ANTHROPIC_API_KEY")
         if not self.api_key:
             raise ValueError("Anthropic API key not found in environment variables")
-        self.client = anthropic.Anthropic(api_key=self.api_key)
+        self.client = anthropic.Anthropic(
+            api_key=self.api_key,
+            http_client=httpx.Client(limits=httpx.Limits(max_keepalive_connections=10)),
+        )
         self.logger.debug("Initialized Anthropic client")
 
     def test_connection(self) -> bool:
@@ -185,9 +280,9 @@ class AnthropicProvider(BaseLLMProvider):
                 messages.append({"role": "system", "content": system_prompt})
             messages.append({"role": "user", "content": prompt})
             
-            self.logger.debug(f"Generating response with provider anthropic")
-            self.logger.debug(f"Prompt length: {len(prompt)} characters")
-            self.logger.debug(f"First 100 chars of prompt: {prompt[:100]}...")
+            self.logger.debug("Generating response with provider anthropic")
+            self.logger.debug("Prompt length: %d characters", len(prompt))
+            self.logger.debug("First 100 chars of prompt: %.100s...", prompt)
             
             response = self.client.messages.create(
                 model=self.model_name,
@@ -202,6 +297,16 @@ class AnthropicProvider(BaseLLMProvider):
             self.logger.error(f"Error generating response: {error_msg}")
             return f"Error: {error_msg}"
 
+# Provider construction dispatch: adding a provider means adding one
+# entry here. The factories defer each SDK import to the provider's
+# __init__, so only the selected backend's dependency tree is loaded.
+PROVIDER_FACTORIES = {
+    LLMProvider.OLLAMA.value: lambda model, kwargs, logger: OllamaProvider(model, kwargs.get("host"), logger),
+    LLMProvider.OPENAI.value: lambda model, kwargs, logger: OpenAIProvider(model, kwargs.get("api_key"), logger),
+    LLMProvider.ANTHROPIC.value: lambda model, kwargs, logger: AnthropicProvider(model, kwargs.get("api_key"), logger),
+}
+
+
 class LLMClient:
     def __init__(self, provider_type: Optional[str] = None, model_name: Optional[str] = None, logger: logging.Logger = None, **kwargs):
         self.logger = logger or logging.getLogger('codemorf')
@@ -209,48 +314,83 @@ class LLMClient:
         # Get provider from environment or parameter
         self.provider_type = provider_type
         self.provider_type = self.provider_type.lower()
+        self.model_name = model_name
+
+        # Repeated prompts (identical rerun, stalled fix loop) are served
+        # from disk instead of a remote round-trip; the lock serializes
+        # cache access when generate runs on worker threads
+        self._prompt_cache = _open_prompt_cache()
+        self._cache_lock = threading.Lock()
         
-        self.logger.debug(f"Selected provider type: {self.provider_type}")
-
-        # Initialize the appropriate provider
-        if self.provider_type == LLMProvider.OLLAMA.value:
-            model = model_name
-            host = kwargs.get("host")
-            self.logger.debug(f"Initializing Ollama provider with model: {model}, host: {host}")
-            self.provider = OllamaProvider(model, host, self.logger)
-        
-        elif self.provider_type == LLMProvider.OPENAI.value:
-            model = model_name
-            api_key = kwargs.get("api_key")
-            self.logger.debug(f"Initializing OpenAI provider with model: {model}")
-            self.provider = OpenAIProvider(model, api_key, self.logger)
-        
-        elif self.provider_type == LLMProvider.ANTHROPIC.value:
-            model = model_name
-            api_key = kwargs.get("api_key")
-            self.logger.debug(f"Initializing Anthropic provider with model: {model}")
-            self.provider = AnthropicProvider(model, api_key, self.logger)
-        
-        else:
+        self.logger.debug("Selected provider type: %s", self.provider_type)
+
+        # Initialize the appropriate provider via the dispatch table
+        factory = PROVIDER_FACTORIES.get(self.provider_type)
+        if factory is None:
             raise ValueError(f"Unsupported LLM provider: {self.provider_type}")
+        self.logger.debug("Initializing %s provider with model: %s", self.provider_type, model_name)
+        self.provider = factory(model_name, kwargs, self.logger)
 
-        # Test connection
-        self._test_connection()
+        # Test connection only when asked: the probe costs an extra
+        # network round-trip (and a billed call for Anthropic) before any
+        # real work, and the first generate() surfaces the same errors
+        if kwargs.get("appconfig", {}).get("test_connection_on_init", False):
+            self._test_connection()
 
     def _test_connection(self):
         """Test connection to the LLM provider."""
         self.provider.test_connection()
 
+    def generate_batch(self, prompts: List[str], system_prompts: Optional[List[Optional[str]]] = None) -> List[str]:
+        """Generate responses for a batch of independent prompts."""
+        self.logger.debug("Generating batch of %d prompts with provider %s", len(prompts), self.provider_type)
+        return self.provider.generate_batch(prompts, system_prompts)
+
+    def close(self):
+        """Release provider resources (e.g. pooled HTTP connections)."""
+        self.provider.close()
+
     def generate(self, prompt: str, system_prompt: Optional[str] = None) -> str:
         """Generate text using the configured LLM provider."""
-        self.logger.debug(f"Generating response with provider {self.provider_type}")
-        self.logger.debug(f"Prompt length: {len(prompt)} characters")
-        self.logger.debug(f"First 100 chars of prompt: {prompt[:100]}...")
-        
+        self.logger.debug("Generating response with provider %s", self.provider_type)
+        self.logger.debug("Prompt length: %d characters", len(prompt))
+        self.logger.debug("First 100 chars of prompt: %.100s...", prompt)
+
+        cache_key = None
+        if self._prompt_cache is not None:
+            cache_key = hashlib.sha256(
+                (self.provider_type + (self.model_name or "") + (system_prompt or "") + prompt).encode()
+            ).hexdigest()
+            with self._cache_lock:
+                row = self._prompt_cache.execute(
+                    "SELECT response_text FROM prompt_cache WHERE prompt_hash = ?", (cache_key,)
+                ).fetchone()
+            if row:
+                self.logger.debug("Prompt cache hit, skipping LLM call")
+                return row[0]
+
         response = self.provider.generate(prompt, system_prompt)
         self.logger.debug("Got LLM response")
+
+        if cache_key is not None and not response.startswith("Error:"):
+            with self._cache_lock:
+                self._prompt_cache.execute(
+                    "INSERT OR REPLACE INTO prompt_cache VALUES (?, ?, ?)",
+                    (cache_key, response, time.time())
+                )
+                self._prompt_cache.commit()
+
         return response
 
+    async def agenerate(self, prompt: str, system_prompt: Optional[str] = None) -> str:
+        """Async variant of generate for drivers batching files with asyncio.
+
+        Runs the blocking provider call on a worker thread, so concurrent
+        awaits overlap their network round-trips while sharing the same
+        prompt cache and pooled connections.
+        """
+        return await asyncio.to_thread(self.generate, prompt, system_prompt)
+
 def get_llm_client(appcfg):
     # Get provider type
     provider_type = appcfg.get("llm_provider")
@@ -1,13 +1,104 @@
 # core/nodes/test_run/test_run.py
 
+import hashlib
 import os
+import shlex
 
 import subprocess
+import threading
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List
 
 from core.workflow_state import WorkflowState
 
+# Hash of the code last written per output file; unchanged code between
+# retry iterations skips the disk write entirely
+_LAST_WRITTEN: Dict[str, bytes] = {}
+
+# Directories already created this process; the fix->test loop re-enters
+# with the same output dir on every iteration
+_ENSURED_DIRS = set()
+
+# Per-test wall-clock budget; individual tests can override via a
+# "timeout" field on the command dict
+DEFAULT_TEST_TIMEOUT = 5
+
+
+def _ensure_dir(path: str):
+    """Create the directory once per process instead of on every call."""
+    if path and path not in _ENSURED_DIRS:
+        os.makedirs(path, exist_ok=True)
+        _ENSURED_DIRS.add(path)
+
+
+def _run_bounded(argv: List[str], env: Dict, timeout: float):
+    """Run a command reading a bounded amount of its output.
+
+    Leading blank lines are skipped and the first non-empty line is the
+    candidate result, matching what strip() gave the full-capture path.
+    One further non-empty line is enough to fail a single-line
+    expectation, so reading stops there: memory stays O(two lines) no
+    matter how much the child prints, and a watchdog kills children that
+    exceed the timeout. Well-behaved tests print their line and exit
+    normally, so their return code is preserved.
+    """
+    proc = subprocess.Popen(
+        argv,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+        env=env
+    )
+    watchdog = threading.Timer(timeout, proc.kill)
+    watchdog.start()
+    try:
+        first = ""
+        for line in proc.stdout:
+            if line.strip():
+                first = line.strip()
+                break
+        extra = ""
+        for line in proc.stdout:
+            if line.strip():
+                # trailing output means the verdict is a mismatch either
+                # way; stop the child rather than draining it
+                extra = line.strip()
+                proc.kill()
+                break
+        try:
+            proc.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            proc.wait()
+        err = proc.stderr.read()
+    finally:
+        watchdog.cancel()
+        proc.stdout.close()
+        proc.stderr.close()
+    actual = first + "\n" + extra if extra else first
+    return actual, err.strip(), proc.returncode
+
+
+def _split_command(command: str):
+    """Tokenize a test command, deciding whether it needs a shell.
+
+    Metacharacters inside quotes (the ';' in \"python -c '...; ...'\") are
+    plain argument text; only unquoted operators or substitutions force
+    the shell path.
+    """
+    if '$' in command or '`' in command:
+        return None, True
+    try:
+        lex = shlex.shlex(command, posix=True, punctuation_chars=True)
+        lex.whitespace_split = True
+        argv = list(lex)
+    except ValueError:
+        return None, True
+    if any(tok and tok[0] in '|&;<>' for tok in argv):
+        return None, True
+    return argv, False
+
 # e.g.
 def node_run_tests(state: WorkflowState) -> WorkflowState:
     """Run tests on the refactored code."""
@@ -16,11 +107,16 @@ def node_run_tests(state: WorkflowState) -> WorkflowState:
     logger.info("Entering Node Function: RUN_TESTS")
 
 
+    # Early-exit only while validating the original code: the fix loop
+    # formats the full failure list into FIX_CODE_PROMPT (and the stall
+    # detector hashes it), so the refactored-code runs need every result
+    test_target = state.get('test_target')
     test_results = execute_all_tests(
-        state[state.get('test_target')],
+        state[test_target],
         state["test_commands"],
         state["code_language"],
-        state["output_file"]  # Pass the output file path
+        state["output_file"],  # Pass the output file path
+        fail_fast=(test_target == 'original_code')
     )
     state["test_results"] = test_results
 
@@ -35,23 +131,40 @@ def node_run_tests(state: WorkflowState) -> WorkflowState:
     return state
 
 
-def execute_all_tests(code: str, test_commands: List[Dict], language: str, output_file: str) -> Dict:
-    """Run test commands and return results."""
+def execute_all_tests(code: str, test_commands: List[Dict], language: str, output_file: str,
+                      fail_fast: bool = False) -> Dict:
+    """Run test commands and return results.
+
+    With fail_fast, pending tests are dropped after the first failure;
+    the failing result is kept so the fixer still sees the detail.
+    """
     logger = logging.getLogger('codemorf')
     logger.debug("Starting run_tests")
     logger.debug(f"Output file: {output_file}")
 
+    # Derive the output directory once; it doubles as the import path
+    # for the generated module
+    output_dir = os.path.dirname(output_file) or "."
+
     # Write the code to the output file first
     try:
         # Create output directory if it doesn't exist
-        output_dir = os.path.dirname(output_file)
-        if output_dir:
-            os.makedirs(output_dir, exist_ok=True)
-            logger.debug(f"Created output directory: {output_dir}")
-
-        with open(output_file, "w") as f:
-            f.write(code)
-        logger.debug(f"Wrote code to {output_file}")
+        if output_dir != ".":
+            _ensure_dir(output_dir)
+
+        data = code.encode("utf-8")
+        digest = hashlib.blake2b(data).digest()
+        if _LAST_WRITTEN.get(output_file) == digest:
+            logger.debug(f"Code unchanged, skipping rewrite of {output_file}")
+        else:
+            # Write to a sibling temp file and rename so concurrently
+            # running tests never import a half-written module
+            tmp_file = output_file + ".tmp"
+            with open(tmp_file, "wb", buffering=1 << 16) as f:
+                f.write(data)
+            os.replace(tmp_file, output_file)
+            _LAST_WRITTEN[output_file] = digest
+            logger.debug(f"Wrote code to {output_file}")
     except Exception as e:
         logger.error(f"Error writing code to file: {e}")
         return {
@@ -60,67 +173,110 @@ def execute_all_tests(code: str, test_commands: List[Dict], language: str, outpu
             "errors": [f"Failed to write code to file: {str(e)}"]
         }
 
-    # Add the output directory to PYTHONPATH
-    output_dir = os.path.dirname(output_file)
-    if output_dir:
-        os.environ["PYTHONPATH"] = output_dir + os.pathsep + os.environ.get("PYTHONPATH", "")
-        logger.debug(f"Added {output_dir} to PYTHONPATH")
-
-    results = []
-    all_passed = True
     errors = []
 
-    for i, test in enumerate(test_commands, 1):
-        logger.debug(f"Running test {i}: {test['command']}")
-        try:
+    # One environment copy shared by every test; PYTHONPATH is extended
+    # only in this copy so repeated runs don't grow the process's own
+    # environment
+    env = os.environ.copy()
+    env["PYTHONPATH"] = output_dir + os.pathsep + env.get("PYTHONPATH", "")
+    logger.debug(f"Added {output_dir} to PYTHONPATH")
+
+    # The tests are independent and dominated by interpreter startup, so
+    # run them concurrently; subprocess waits release the GIL
+    if len(test_commands) > 1:
+        max_workers = min(len(test_commands), os.cpu_count() or 4)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(_run_one, i, test, env, logger)
+                       for i, test in enumerate(test_commands, 1)]
+            if fail_fast:
+                # collect in submission order so the result set for a
+                # given failure is deterministic across runs
+                results = []
+                for future in futures:
+                    result = future.result()
+                    results.append(result)
+                    if not result["passed"]:
+                        # skip whatever has not started yet
+                        for f in futures:
+                            f.cancel()
+                        break
+            else:
+                results = [f.result() for f in futures]
+    else:
+        results = []
+        for i, test in enumerate(test_commands, 1):
+            result = _run_one(i, test, env, logger)
+            results.append(result)
+            if fail_fast and not result["passed"]:
+                break
+
+    all_passed = all(r["passed"] for r in results)
+
+    logger.info(f"Test results: {'All tests passed' if all_passed else 'Some tests failed'}")
+    return {
+        "all_passed": all_passed,
+        "test_results": results,
+        "errors": errors
+    }
+
+
+def _run_one(i: int, test: Dict, env: Dict, logger: logging.Logger) -> Dict:
+    """Run a single test command and build its result record."""
+    command = test["command"]
+    logger.debug(f"Running test {i}: {command}")
+    try:
+        # Plain commands run as an argv list, skipping the /bin/sh fork;
+        # anything using shell syntax keeps the shell
+        argv, use_shell = _split_command(command)
+        timeout = test.get("timeout", DEFAULT_TEST_TIMEOUT)
+        expected = test["expected_result"]
+        if not use_shell and "\n" not in expected:
+            # Single-line expectation: a bounded read caps memory even if
+            # the generated code prints forever
+            actual, error_output, return_code = _run_bounded(argv, env, timeout)
+        else:
             result = subprocess.run(
-                test["command"],
-                shell=True,
+                command if use_shell else argv,
+                shell=use_shell,
                 capture_output=True,
                 text=True,
-                env=os.environ.copy()  # Use a copy of the environment
+                env=env,
+                timeout=timeout
             )
             actual = result.stdout.strip()
             error_output = result.stderr.strip()
             return_code = result.returncode
 
-            test_result = {
-                "test_number": i,
-                "command": test["command"],
-                "expected": test["expected_result"],
-                "actual": actual,
-                "error_output": error_output,
-                "passed": actual == test["expected_result"] and return_code == 0,
-                "return_code": return_code
-            }
-            results.append(test_result)
-
-            if not test_result["passed"]:
-                all_passed = False
-                if error_output:
-                    logger.warning(f"Test {i} had error output: {error_output}")
-                if return_code != 0:
-                    logger.warning(f"Test {i} failed with return code: {return_code}")
-                if actual != test["expected_result"]:
-                    logger.warning(f"Test {i} failed: expected '{test['expected_result']}', got '{actual}'")
-
-        except Exception as e:
-            logger.error(f"Error running test {i}: {e}")
-            all_passed = False
-            results.append({
-                "test_number": i,
-                "command": test["command"],
-                "expected": test["expected_result"],
-                "actual": "",
-                "error_output": str(e),
-                "passed": False,
-                "return_code": -1
-            })
+        test_result = {
+            "test_number": i,
+            "command": test["command"],
+            "expected": test["expected_result"],
+            "actual": actual,
+            "error_output": error_output,
+            "passed": actual == test["expected_result"] and return_code == 0,
+            "return_code": return_code
+        }
+
+        if not test_result["passed"]:
+            if error_output:
+                logger.warning(f"Test {i} had error output: {error_output}")
+            if return_code != 0:
+                logger.warning(f"Test {i} failed with return code: {return_code}")
+            if actual != test["expected_result"]:
+                logger.warning(f"Test {i} failed: expected '{test['expected_result']}', got '{actual}'")
 
-    logger.info(f"Test results: {'All tests passed' if all_passed else 'Some tests failed'}")
-    return {
-        "all_passed": all_passed,
-        "test_results": results,
-        "errors": errors
-    }
+        return test_result
+
+    except Exception as e:
+        logger.error(f"Error running test {i}: {e}")
+        return {
+            "test_number": i,
+            "command": test["command"],
+            "expected": test["expected_result"],
+            "actual": "",
+            "error_output": str(e),
+            "passed": False,
+            "return_code": -1
+        }
 
@@ -1,9 +1,22 @@
 import logging
 import os
 import json
+import re
+
+try:
+    import orjson
+except ImportError:  # optional speedup; stdlib json is the fallback
+    orjson = None
+
+try:
+    import ijson
+except ImportError:  # optional: incremental parse for long command lists
+    ijson = None
 
 from core.workflow_state import WorkflowState
 
+FUNC_DEF_RE = re.compile(r'def\s+(\w+)\s*\(')
+
 
 def node_generate_executable_tests(state: WorkflowState) -> WorkflowState:
     """Generate test commands from original code and test cases."""
@@ -11,14 +24,25 @@ def node_generate_executable_tests(state: WorkflowState) -> WorkflowState:
 
     logger.info("Entering Node Function: GENERATE_EXECUTABLE_TESTS")
 
-    logger.debug(f"save_test_commands path: {state.get('save_test_commands')}")
+    logger.debug("save_test_commands path: %s", state.get('save_test_commands'))
 
     llm = state["llm"]
 
     # Get the module name from the output file path
     output_file = state["output_file"]
     module_name = os.path.splitext(os.path.basename(output_file))[0]
-    logger.debug(f"Using module name: {module_name}")
+    logger.debug("Using module name: %s", module_name)
+
+    # Structured test cases are deterministic: build the commands in
+    # Python and skip the LLM round-trip entirely
+    test_commands = _synthesize_test_commands(
+        state['test_cases'], state['original_code'], module_name
+    )
+    if test_commands is not None:
+        logger.info("Synthesized %d test commands from structured test cases", len(test_commands))
+        state["test_commands"] = test_commands
+        _save_test_commands(state, test_commands, logger)
+        return state
 
     prompt = GENERATE_TEST_CMD.format(
         module_name=module_name,
@@ -30,7 +54,7 @@ def node_generate_executable_tests(state: WorkflowState) -> WorkflowState:
     logger.debug("Calling LLM generate for test commands")
     response = llm.generate(prompt)
     logger.debug("Got LLM response for test commands")
-    logger.debug(f"Raw response: {response}")
+    logger.debug("Raw response: %s", response)
 
     try:
         # Clean the response to ensure it's valid JSON
@@ -41,10 +65,19 @@ def node_generate_executable_tests(state: WorkflowState) -> WorkflowState:
             response = response[:-3]
         response = response.strip()
 
-        # Parse the JSON response
-        test_commands = json.loads(response)
-        if not isinstance(test_commands, list):
-            raise ValueError("Response is not a list")
+        # Parse the JSON response; ijson builds the list incrementally
+        # instead of materialising the whole parse tree first
+        if ijson:
+            # ijson yields nothing for both an empty array and a non-array
+            # document, so check the shape up front to match the other
+            # branches (empty list accepted, non-list rejected)
+            if not response.startswith('['):
+                raise ValueError("Response is not a list")
+            test_commands = list(ijson.items(response.encode(), "item"))
+        else:
+            test_commands = orjson.loads(response) if orjson else json.loads(response)
+            if not isinstance(test_commands, list):
+                raise ValueError("Response is not a list")
 
         # Validate each command has required fields
         for cmd in test_commands:
@@ -52,27 +85,14 @@ def node_generate_executable_tests(state: WorkflowState) -> WorkflowState:
                 raise ValueError("Each command must have 'command' and 'expected_result' fields")
 
         state["test_commands"] = test_commands
-        logger.debug(f"Generated {len(test_commands)} test commands")
+        logger.debug("Generated %d test commands", len(test_commands))
 
         # Save test commands if flag is set
-
-        if state.get("save_workflow_stages"):
-            #
-            logger.debug(f"Work Dir: {state.get('work_dir')}")
-            file_name = os.path.join(state.get('work_dir'), "executable_tests.json")
-            logger.debug(f"Checking save_test_commands path: {file_name}")
-
-            try:
-                with open(file_name, "w") as f:
-                    json.dump(test_commands, f, indent=2)
-                logger.debug(f"Saved test commands to {file_name}")
-            except Exception as e:
-                logger.error(f"Error saving executable test commands: {e}")
-                logger.debug(f"Working directory defined as: {state.get('work_dir')}")
+        _save_test_commands(state, test_commands, logger)
 
     except Exception as e:
         logger.error(f"Error parsing test commands: {e}")
-        logger.debug(f"Response that caused error: {response}")
+        logger.debug("Response that caused error: %s", response)
         # Create a default test command if parsing fails
         state["test_commands"] = [{
             "command": f"python -c 'from {module_name} import multiply_a_b; print(multiply_a_b(2, 3))'",
@@ -82,6 +102,58 @@ def node_generate_executable_tests(state: WorkflowState) -> WorkflowState:
     return state
 
 
+def _synthesize_test_commands(test_cases, original_code, module_name):
+    """Build test commands directly when test cases carry inputs/expected pairs.
+
+    Returns None when the cases are free-form text, in which case the
+    caller falls back to the LLM.
+    """
+    if not (isinstance(test_cases, list) and test_cases and
+            all(isinstance(tc, dict) and "inputs" in tc and "expected" in tc
+                for tc in test_cases)):
+        return None
+
+    function_name_match = FUNC_DEF_RE.search(original_code)
+    if not function_name_match:
+        return None
+    function_name = function_name_match.group(1)
+
+    commands = []
+    for tc in test_cases:
+        inputs = tc["inputs"]
+        if isinstance(inputs, (list, tuple)):
+            args = ", ".join(repr(a) for a in inputs)
+        else:
+            args = repr(inputs)
+        commands.append({
+            "command": f"python -c 'from {module_name} import {function_name}; "
+                       f"print({function_name}({args}))'",
+            "expected_result": str(tc["expected"])
+        })
+    return commands
+
+
+def _save_test_commands(state, test_commands, logger):
+    """Save the commands to the work dir when workflow stages are kept."""
+    if not state.get("save_workflow_stages"):
+        return
+
+    logger.debug("Work Dir: %s", state.get('work_dir'))
+    file_name = os.path.join(state.get('work_dir'), "executable_tests.json")
+    logger.debug("Checking save_test_commands path: %s", file_name)
+
+    try:
+        if orjson:
+            with open(file_name, "wb") as f:
+                f.write(orjson.dumps(test_commands, option=orjson.OPT_INDENT_2))
+        else:
+            with open(file_name, "w") as f:
+                json.dump(test_commands, f, indent=2)
+        logger.debug("Saved test commands to %s", file_name)
+    except Exception as e:
+        logger.error(f"Error saving executable test commands: {e}")
+        logger.debug(f"Working directory defined as: {state.get('work_dir')}")
+
 
 # Prompts:
 
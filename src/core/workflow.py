@@ -4,6 +4,7 @@ from langgraph.graph import StateGraph, END
 
 import sys
 import logging
+from functools import lru_cache
 
 
 
@@ -39,6 +40,10 @@ def should_fix_code(state: WorkflowState) -> str:
         logger.debug("All tests passed, returning output")
         return "output"
 
+    if state.get("stalled"):
+        logger.error("Fix loop stalled on an identical prompt, Stopping cycle. returning output")
+        return "output"
+
     if iteration >= max_iterations:
         logger.error(f"Max iterations ({max_iterations}) reached, Stopping cycle. returning output")
         return "output"  # Stop after max iterations even if not fixed
@@ -47,8 +52,24 @@ def should_fix_code(state: WorkflowState) -> str:
     logger.debug("exiting function: SHOULD_FIX_CODE")
     return "fix"
 
+def should_refactor(state: WorkflowState) -> str:
+    """Skip the refactor loop when the original code already satisfies everything."""
+    logger = state.get("logger", logging.getLogger('codemorf'))
+
+    test_results = state.get("test_results")
+    if (test_results and test_results.get("all_passed")
+            and not state.get("requirements")):
+        logger.info("Original code passes all tests and no requirements given, skipping refactor")
+        return "output"
+    return "refactor"
+
+@lru_cache(maxsize=4)
 def create_refactoring_workflow(llm: LLMClient, logger: logging.Logger = None):
-    """Create the refactoring workflow."""
+    """Create the refactoring workflow.
+
+    Cached per (llm, logger) identity: node registration, edge wiring and
+    Pregel compilation happen once per client rather than per invocation.
+    """
     logger = logger or logging.getLogger('codemorf')
     logger.debug("Creating workflow")
     
@@ -87,7 +108,16 @@ def create_refactoring_workflow(llm: LLMClient, logger: logging.Logger = None):
 
     # Add Edges
     workflow.add_edge("generate_tests", "validate_tests")
-    workflow.add_edge("validate_tests", "refactor")  # Generate tests first
+    # Refactor only when needed: passing original code with no
+    # requirements goes straight to END, saving the LLM round-trip
+    workflow.add_conditional_edges(
+        "validate_tests",
+        should_refactor,
+        {
+            "refactor": "refactor",
+            "output": END
+        }
+    )
     workflow.add_edge("refactor", "test")
     workflow.add_edge("fix", "test")  # Loop back to test after fixing
     workflow.add_conditional_edges(
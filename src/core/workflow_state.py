@@ -18,4 +18,8 @@ class WorkflowState(TypedDict):
     save_workflow_stages: bool  # Save interim results
     work_dir: str # where to save interim results
     output_file: str  # Path to the output file
-    logger: Optional[logging.Logger]  # Add logger to state
\ No newline at end of file
+    logger: Optional[logging.Logger]  # Add logger to state
+    last_prompt_hash: Optional[bytes]  # Hash of the last code_modify prompt
+    last_response: Optional[str]  # LLM response for that prompt
+    stalled: Optional[bool]  # Fix loop replayed an identical prompt; no progress possible
+    original_function_name: Optional[str]  # Function name parsed from original_code once
\ No newline at end of file